@@ -3,6 +3,85 @@
 import numpy as np
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
+from scipy.special import expit
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# integer tags used to dispatch activations inside the jitted kernels
+SIGMOID_TAG = 0
+TANH_TAG = 1
+FREE_TAG = 2
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _layer_forward(a, w_t, b, z, a_out, act_tag):
+        """
+        fused linear + bias + activation kernel for a single layer
+
+        writes into preallocated buffers so repeated forward passes
+        avoid per-call allocations
+
+        :param a: previous activations (n_obs, n_in)
+        :param w_t: transposed weights (n_in, n_out)
+        :param b: bias (n_out,)
+        :param z: preallocated pre-activation buffer (n_obs, n_out)
+        :param a_out: preallocated activation buffer (n_obs, n_out)
+        :param act_tag: integer tag selecting the activation
+        """
+
+        np.dot(a, w_t, z)
+
+        for i in prange(z.shape[0]):
+            for j in range(z.shape[1]):
+                z[i, j] += b[j]
+
+                if act_tag == SIGMOID_TAG:
+                    a_out[i, j] = 1. / (1. + np.exp(-z[i, j]))
+
+                elif act_tag == TANH_TAG:
+                    a_out[i, j] = np.tanh(z[i, j])
+
+                else:
+                    a_out[i, j] = z[i, j]
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _layer_delta(dC_dA, a, act_tag):
+        """
+        fused elementwise kernel for dC_dA * activation_derivative(a)
+
+        :param dC_dA: derivative of cost wrt activations (n_obs, n_out)
+        :param a: activations of the layer (n_obs, n_out)
+        :param act_tag: integer tag selecting the activation
+
+        :returns delta: shared multiplicative backprop term
+        """
+
+        delta = np.empty_like(dC_dA)
+
+        for i in prange(a.shape[0]):
+            for j in range(a.shape[1]):
+
+                if act_tag == SIGMOID_TAG:
+                    sig = 1. / (1. + np.exp(-a[i, j]))
+                    delta[i, j] = dC_dA[i, j] * sig * (1. - sig)
+
+                elif act_tag == TANH_TAG:
+                    tanh = np.tanh(a[i, j])
+                    delta[i, j] = dC_dA[i, j] * (1. - tanh * tanh)
+
+                else:
+                    delta[i, j] = dC_dA[i, j]
+
+        return delta
+
 
 class Loss:
     """
@@ -49,9 +128,12 @@ class MSE(Loss):
     def __derivative__(self, x, y):
         """
         Calculates Derivative of Mean Squared Error w.r.t to X
+
+        returns the per-element gradient normalized by the number of
+        features (the batch mean is taken downstream in backward)
         """
 
-        return 2*np.mean(x - y)
+        return (2 / x.shape[-1]) * (x - y)
 
 
 class CE(Loss):
@@ -59,30 +141,59 @@ class CE(Loss):
     Cross Entropy Loss with SoftMax included
     """
 
+    def __init__(self):
+
+        # caches the forward pass softmax for reuse in the derivative
+        self._last_x = None
+        self._last_p = None
+
     def softmax(self, x):
         """
-        calculates softmax of a given array
+        calculates softmax over the last axis of a given array
+
+        keeps each observation's reduction separate so batched
+        (n_obs, n_classes) inputs are handled in a single pass
         """
 
-        exps = np.exp(x - np.max(x))
-        return exps / np.sum(exps)
+        exps = np.exp(x - np.max(x, axis=-1, keepdims=True))
+        return exps / np.sum(exps, axis=-1, keepdims=True)
 
     def __loss__(self, x, y):
         """
         Applies softmax to an array then calculates loss
+
+        returns the mean loss over the observations in the batch
         """
 
         p = self.softmax(x)
-        loss = np.sum(-y * np.log(p))
+        self._last_x = x
+        self._last_p = p
+
+        loss = np.sum(-y * np.log(p + 1e-12), axis=-1).mean()
         return loss
 
     def __derivative__(self, x, y):
         """
         Calculates derivative of Cross Entropy w.r.t X
         (SoftMax gradient included)
+
+        reuses the softmax cached by the immediately preceding loss
+        call when the input is the same array
+
+        the cache is consumed on use: forward passes reuse their
+        output buffers in place, so a stored softmax is only trusted
+        for the single loss-then-derivative pairing
         """
 
-        grad = self.softmax(x) - y
+        if x is self._last_x:
+            p = self._last_p
+            self._last_x = None
+            self._last_p = None
+
+        else:
+            p = self.softmax(x)
+
+        grad = p - y
         return grad
 
 
@@ -119,45 +230,23 @@ class Sigmoid(Activation):
     Sigmoidal Activation function
     """
 
-    def __positive__(self, x):
-        """
-        calculates positive terms
-        """
-
-        return 1 / (1 + np.exp(-x))
-
-    def __negative__(self, x):
-        """
-        calculates negative terms
-        """
-
-        exps = np.exp(x)
-        return exps / (1 + exps)
-
     def __activation__(self, x):
         """
         calculates sigmoid function in a numerically stable way
         """
 
-        mask_p = x >= 0
-        mask_n = ~mask_p
-
-        sig = np.zeros_like(x)
-        if np.any(mask_p):
-            sig[mask_p] = self.__positive__(x[mask_p])
-
-        if np.any(mask_n):
-            sig[mask_n] = self.__negative__(x[mask_n])
-
-        return sig
+        return expit(x)
 
     def __derivative__(self, x):
         """
         implemented derivative of sigmoid function
         """
 
-        sig = self.__activation__(x)
-        return sig * (1 - sig)
+        sig = expit(x)
+        one_minus = np.subtract(1, sig)
+        np.multiply(sig, one_minus, out=sig)
+
+        return sig
 
 
 class TanH(Activation):
@@ -170,19 +259,18 @@ class TanH(Activation):
         calculates activation
         """
 
-        ez = np.exp(x)
-        enz = np.exp(-x)
-
-        return (ez - enz) / (ez + enz)
+        return np.tanh(x)
 
     def __derivative__(self, x):
         """
         calculates derivative
         """
 
-        tanh = self.__activation__(x)
+        tanh = np.tanh(x)
+        np.multiply(tanh, tanh, out=tanh)
+        np.subtract(1, tanh, out=tanh)
 
-        return 1 - (tanh**2)
+        return tanh
 
 
 class Free(Activation):
@@ -204,31 +292,50 @@ class Free(Activation):
         return 1
 
 
+# maps known Activation classes to their kernel dispatch tags
+ACTIVATION_TAGS = {
+    Sigmoid: SIGMOID_TAG,
+    TanH: TANH_TAG,
+    Free: FREE_TAG
+}
+
+
 class NeuralNetwork:
     """
     Implementation of a feed forward neural network with backpropagation
 
     :param layers: a list of (int, NN.Activation) tuples to specify layers
     :param learning_rate: the learning rate to train model with
+    :param dtype: the floating point dtype of weights and activations
     """
 
-    def __init__(self, layers, learning_rate=0.1):
+    def __init__(self, layers, learning_rate=0.1, dtype=np.float32):
 
-        self.layers = np.array(layers)
-        self.learning_rate = np.array(learning_rate).reshape(1, 1)
+        # store sizes and activations as parallel plain tuples
+        self._sizes = tuple(layer[0] for layer in layers)
+        self._acts = tuple(layer[1] for layer in layers)
+        self.dtype = dtype
+        self.learning_rate = np.array(
+            learning_rate, dtype=dtype
+        ).reshape(1, 1)
 
         self.params = {
             "weights": [],
+            "weights_T": [],
             "f": [],
             "bias": [],
             "zs": [],
             "as": []
         }
 
-        self.d_weights = []
-        self.d_bias = []
+        self._act_tags = []
+        self._act_fn = []
+        self._act_deriv = []
+        self._pool = None
+        self._buf_n_obs = None
 
         self._initialize_params()
+        self.clear()
 
     def _initialize_params(self):
         """
@@ -237,176 +344,277 @@ class NeuralNetwork:
         stores all internal parameters within indexable dictionary
         """
 
-        for i in np.arange(self.layers.shape[0]):
+        for i in range(len(self._sizes)):
 
             if i > 0:
 
                 self.params['weights'].append(
                     np.random.random(
-                        (self.layers[i][0], self.layers[i-1][0])
-                    )
+                        (self._sizes[i], self._sizes[i-1])
+                    ).astype(self.dtype)
+                )
+
+                # contiguous transpose kept in sync with the weights
+                self.params['weights_T'].append(
+                    np.ascontiguousarray(self.params['weights'][-1].T)
                 )
 
                 self.params['bias'].append(
-                    np.random.random(self.layers[i][0])
+                    np.random.random(self._sizes[i]).astype(self.dtype)
                 )
 
             self.params['zs'].append(
-                np.zeros(self.layers[i][0]).reshape(self.layers[i][0], 1)
+                np.zeros(
+                    (self._sizes[i], 1), dtype=self.dtype
+                )
             )
 
             self.params['as'].append(
-                np.zeros(self.layers[i][0]).reshape(self.layers[i][0], 1)
+                np.zeros(
+                    (self._sizes[i], 1), dtype=self.dtype
+                )
             )
 
-            if self.layers[i][1] is None:
+            if self._acts[i] is None:
                 self.params['f'].append(
-                    self.layers[i][1]
+                    self._acts[i]
                 )
 
+                self._act_fn.append(None)
+                self._act_deriv.append(None)
+
             else:
-                self.params['f'].append(
-                    self.layers[i][1]()
-                )
+                f = self._acts[i]()
+                self.params['f'].append(f)
+
+                # cache bound methods to skip per-call attribute lookups
+                self._act_fn.append(f.activation)
+                self._act_deriv.append(f.derivative)
+
+            # integer tag for jitted dispatch (None for unknown activations)
+            self._act_tags.append(
+                ACTIVATION_TAGS.get(self._acts[i])
+            )
 
     def forward(self, x):
         """
         forward propagation through network
 
-        :params x: input layer to pass forward
+        operates on a full batch of observations so that each layer
+        is a single matrix-matrix product
+
+        :params x: input batch of shape (n_obs, n_in) to pass forward
 
-        :returns y: final activation layer
+        :returns y: final activation layer of shape (n_obs, n_out)
         """
 
+        x = np.atleast_2d(
+            np.asarray(x, dtype=self.dtype)
+        )
+
+        self._allocate_buffers(x.shape[0])
         self.params['as'][0] = x
 
-        for idx in np.arange(1, self.layers.shape[0]):
+        for idx in range(1, len(self._sizes)):
 
             # index previous activations
             a = self.params['as'][idx-1]
 
-            # index weights
-            w = self.params['weights'][idx-1]
+            # index precomputed contiguous weight transpose
+            w_t = self.params['weights_T'][idx-1]
 
             # index bias
             b = self.params['bias'][idx-1]
 
-            # calculate z_array
-            self.params['zs'][idx] = (
-                (a @ w.T) + b
-            )
+            # index reusable pre-activation buffer
+            z = self.params['zs'][idx]
 
-            # calculate activation
-            self.params['as'][idx] = self.params['f'][idx].activation(
-                self.params['zs'][idx]
-            )
+            # fused linear + bias + activation kernel for known activations
+            if NUMBA_AVAILABLE and self._act_tags[idx] is not None:
+
+                _layer_forward(
+                    np.ascontiguousarray(a, dtype=w_t.dtype),
+                    w_t,
+                    b,
+                    z,
+                    self.params['as'][idx],
+                    self._act_tags[idx]
+                )
+
+            # fall back to the polymorphic path for custom activations
+            else:
+
+                # calculate z_array in place
+                np.matmul(a, w_t, out=z)
+                np.add(z, b, out=z)
+
+                # calculate activation
+                self.params['as'][idx] = self._act_fn[idx](z)
 
         return self.params['as'][-1]
 
+    def _allocate_buffers(self, n_obs):
+        """
+        allocates the pre-activation and activation buffers for a
+        given batch size
+
+        reuses the existing buffers when the batch size is unchanged
+        so repeated forward passes avoid allocator churn
+
+        :param n_obs: number of observations in the batch
+        """
+
+        if self._buf_n_obs == n_obs:
+            return
+
+        for i in range(1, len(self._sizes)):
+            self.params['zs'][i] = np.zeros(
+                (n_obs, self._sizes[i]), dtype=self.dtype
+            )
+            self.params['as'][i] = np.zeros(
+                (n_obs, self._sizes[i]), dtype=self.dtype
+            )
+
+        self._buf_n_obs = n_obs
+
     def backward(self, y, Loss):
         """
         calculates gradients via backpropagation
 
-        :param y: true values to calculate loss
+        expects the full batch from the previous forward pass and
+        averages the per-observation gradients internally
+
+        :param y: true values of shape (n_obs, n_out) to calculate loss
         :param Loss: NN.Loss object to calculate derivative with
         """
 
         # cache previous layers derivatives
         cache_dC_dA_dZ = []
 
-        # initialize derivative weights and biases to fill
-        d_weights = self.params['weights'].copy()
-        d_bias = self.params['bias'].copy()
+        # worker pool overlapping gradient GEMMs with the delta chain
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2)
+
+        futures = []
 
         # walk through network backwards
-        for idx in np.arange(self.layers.shape[0])[::-1]:
+        for idx in range(len(self._sizes) - 1, -1, -1):
 
             # dont derive the input layer
             if idx == 0:
                 break
 
             # derivative of the cost function
-            elif idx == self.layers.shape[0] - 1:
+            elif idx == len(self._sizes) - 1:
 
                 # derivative of cost wrt final activation
-                dC_dA = np.full(
-                    self.layers[idx][0],
-                    Loss.derivative(self.params['as'][idx], y)
-                )
-                dC_dA = dC_dA.reshape(1, dC_dA.size)
+                dC_dA = Loss.derivative(self.params['as'][idx], y)
 
             # derivative of cost wrt layers activation
             else:
 
                 # calculates current activation derivative using cached layers
-                dC_dA = cache_dC_dA_dZ[-1].T @ self.params['weights'][idx]
+                dC_dA = cache_dC_dA_dZ[-1] @ self.params['weights'][idx]
 
-            # derivative of activation wrt z-layer
-            dA_dZ = self.params['f'][idx].derivative(
-                self.params['as'][idx]
-            )
+            # fused elementwise kernel for known activations
+            if NUMBA_AVAILABLE and self._act_tags[idx] is not None:
 
-            # derivative of z-layer wrt to weights
-            dZ_dW = self.params['as'][idx-1].\
-                reshape(1, self.params['as'][idx-1].size)
+                dC_dA_dZ = _layer_delta(
+                    np.ascontiguousarray(dC_dA),
+                    np.ascontiguousarray(self.params['as'][idx]),
+                    self._act_tags[idx]
+                )
 
-            # perform shared multiplicative term
-            dC_dA_dZ = (dC_dA * dA_dZ).reshape(self.layers[idx][0], 1)
+            else:
 
-            # derivative of cost wrt to weights
-            dC_dW = self.learning_rate * (dC_dA_dZ @ dZ_dW)
+                # derivative of activation wrt z-layer
+                dA_dZ = self._act_deriv[idx](
+                    self.params['as'][idx]
+                )
 
-            # derivative of cost wrt to bias
-            dC_dB = (self.learning_rate * dC_dA_dZ).reshape(-1)
+                # perform shared multiplicative term
+                dC_dA_dZ = dC_dA * dA_dZ
 
-            # cache calculated derivatives
+            # cache the shared term for the next layer's dC_dA
             cache_dC_dA_dZ.append(dC_dA_dZ)
-            d_weights[idx - 1] = dC_dW.copy()
-            d_bias[idx - 1] = dC_dB.copy()
 
-        self.d_weights.append(d_weights)
-        self.d_bias.append(d_bias)
+            # offload this layer's gradient while the chain walks back
+            futures.append(
+                self._pool.submit(self._accumulate_layer, idx, dC_dA_dZ)
+            )
 
-    def step(self):
+        # join all layer gradients before the accumulators are read
+        for future in futures:
+            future.result()
+
+        self.n_grads += 1
+
+    def _accumulate_layer(self, idx, dC_dA_dZ):
         """
-        Steps through weights and biases and applies derivatives
+        computes a single layer's weight and bias gradients and adds
+        them to the accumulators
+
+        independent of the backward delta chain once dC_dA_dZ is known,
+        so it can run on the worker pool while later layers are derived
+
+        :param idx: index of the layer being derived
+        :param dC_dA_dZ: shared multiplicative backprop term
         """
 
-        # iterate through layers
-        for i in np.arange(len(self.params['weights'])):
+        # number of observations in the batch
+        n_obs = dC_dA_dZ.shape[0]
 
-            # prepare tensor
-            d_weight_tensor = []
-            d_bias_tensor = []
+        # fold learning rate and batch mean into a single scaling pass
+        scaled = (self.learning_rate / n_obs) * dC_dA_dZ
 
-            # iterate through all derivatives
-            for mdx in np.arange(len(self.d_weights)):
+        # derivative of cost wrt to weights
+        dC_dW = scaled.T @ self.params['as'][idx-1]
 
-                dw = self.d_weights[mdx][i]
-                db = self.d_bias[mdx][i]
+        # derivative of cost wrt to bias
+        dC_dB = scaled.sum(axis=0)
 
-                d_weight_tensor.append(dw)
-                d_bias_tensor.append(db)
+        self.acc_dW[idx - 1] += dC_dW
+        self.acc_dB[idx - 1] += dC_dB
 
-            # consolidate arrays into multidimensional tensor
-            d_weight_tensor = np.array(d_weight_tensor)
-            d_bias_tensor = np.array(d_bias_tensor)
+    def step(self):
+        """
+        Steps through weights and biases and applies mean gradients
+        """
+
+        # iterate through layers
+        for i in range(len(self.params['weights'])):
 
-            # take mean across the zero axis
-            mean_d_weight_tensor = d_weight_tensor.mean(axis=0)
-            mean_d_bias_tensor = d_bias_tensor.mean(axis=0)
+            # scale accumulators to the mean gradient in place
+            np.divide(self.acc_dW[i], self.n_grads, out=self.acc_dW[i])
+            np.divide(self.acc_dB[i], self.n_grads, out=self.acc_dB[i])
 
-            # update weights and biases
-            self.params['weights'][i] -= mean_d_weight_tensor
-            self.params['bias'][i] -= mean_d_bias_tensor
+            # update weights and biases without temporaries
+            np.subtract(
+                self.params['weights'][i], self.acc_dW[i],
+                out=self.params['weights'][i]
+            )
+            np.subtract(
+                self.params['bias'][i], self.acc_dB[i],
+                out=self.params['bias'][i]
+            )
+
+            # refresh the contiguous transpose used in forward
+            self.params['weights_T'][i] = np.ascontiguousarray(
+                self.params['weights'][i].T
+            )
 
     def clear(self):
         """
-        Empty the current derivatives and biases
+        Reset the gradient accumulators between steps
         """
 
-        self.d_weights = []
-        self.d_bias = []
+        self.acc_dW = [
+            np.zeros_like(w) for w in self.params['weights']
+        ]
+        self.acc_dB = [
+            np.zeros_like(b) for b in self.params['bias']
+        ]
+        self.n_grads = 0
 
     def fit(self, X, Y, Loss, n_epochs=100, status_updates=10, verbose=False):
         """
@@ -421,25 +629,22 @@ class NeuralNetwork:
         """
 
         # iterate through dataset
-        for epoch in np.arange(n_epochs):
+        for epoch in range(n_epochs):
 
             # holds losses during epoch
             losses = []
 
-            # iterate through observations and labels
-            for x, y in zip(X, Y):
+            # forward pass over the full batch
+            pred = self.forward(X)
 
-                # forward pass
-                pred = self.forward(x)
+            # calculate loss
+            loss = Loss.loss(pred, Y)
 
-                # calculate loss
-                loss = Loss.loss(pred, y)
+            # calculate gradient
+            self.backward(Y, Loss)
 
-                # calculate gradient
-                self.backward(y, Loss)
-
-                # store loss
-                losses.append(loss)
+            # store loss
+            losses.append(loss)
 
             # applies gradient descent
             self.step()
@@ -459,10 +664,10 @@ class NeuralNetwork:
 
     def minibatch_reader(self, *args, batch_size=10):
         """
-        Shuffles indices and yields batches of indices
+        Shuffles observations and yields batched subsets of each dataset
 
-        :params args: any number of datasets to create batched indices for
-        :returns g: a generator of indices used to subset datasets
+        :params args: any number of datasets to subset together
+        :returns g: a generator of tuples holding each dataset's batch
         """
 
         num_obs = np.unique([a.shape[0] for a in args])
@@ -484,7 +689,8 @@ class NeuralNetwork:
             if j > num_obs[0]:
                 j = num_obs[0]
 
-            yield random_indices[i:j]
+            ind = random_indices[i:j]
+            yield tuple(a[ind] for a in args)
 
     def minibatch_fit(self, X, Y, Loss, n_epochs=100,
                       batch_size=10, status_updates=10,
@@ -503,28 +709,23 @@ class NeuralNetwork:
         """
 
         # iterate through dataset
-        for epoch in np.arange(n_epochs):
+        for epoch in range(n_epochs):
 
             # stores losses
             losses = []
 
-            # read indices from minibatches
-            for ind in self.minibatch_reader(X, Y, batch_size=batch_size):
-
-                # subset x and y with indices
-                sub_X = X[ind]
-                sub_Y = Y[ind]
-
-                # fit batch
-                for x, y in zip(sub_X, sub_Y):
+            # read batched subsets from the reader
+            for sub_X, sub_Y in self.minibatch_reader(
+                    X, Y, batch_size=batch_size
+                    ):
 
-                    # forward pass
-                    pred = self.forward(x)
-                    loss = Loss.loss(pred, y)
+                # fit batch with a single forward/backward pass
+                pred = self.forward(sub_X)
+                loss = Loss.loss(pred, sub_Y)
 
-                    # backward prop
-                    self.backward(y, Loss)
-                    losses.append(loss)
+                # backward prop
+                self.backward(sub_Y, Loss)
+                losses.append(loss)
 
                 # apply gradients each batch
                 self.step()
@@ -547,12 +748,6 @@ class NeuralNetwork:
         :returns Y: Predicted labels of X
         """
 
-        # stores predictions
-        predictions = []
-        for x in X:
-
-            # forward pass
-            pred = self.forward(x)
-            predictions.append(pred)
-
-        return np.array(predictions)
+        # forward pass over all observations at once
+        # copied so later passes reusing the buffers can't mutate it
+        return self.forward(X).copy()
@@ -22,28 +22,44 @@ class FastaReader:
 
         with open(self.path, "r") as f:
             header = None
-            seq = ""
-            while True:
-                try:
-                    line = next(f)
-                    if ">" in line:
-                        if not header:
-                            header = line.strip()
-                            seq = ""
-                            continue
-                        else:
-                            rec = (header, seq)
-                            header = line.strip()
-                            seq = ""
-                            yield rec
-                    else:
-                        seq += line.strip()
-
-                except StopIteration:
-                    rec = (header, seq)
-                    break
-
-        yield rec
+            seq_parts = []
+
+            for line in f:
+                if ">" in line:
+                    if header:
+                        yield (header, ''.join(seq_parts))
+
+                    header = line.strip()
+                    seq_parts = []
+
+                else:
+                    seq_parts.append(line.strip())
+
+        yield (header, ''.join(seq_parts))
+
+    def to_npy(self, path_out):
+        """
+        parses the fasta once and caches every sequence into a single
+        zero-padded uint8 array
+
+        subsequent runs can memory map the cache instead of reparsing
+        the text file
+
+        :params [path_out]: filename of the .npy cache to write
+        """
+
+        seqs = [
+            np.frombuffer(seq.encode("ascii"), np.uint8)
+            for header, seq in self
+        ]
+
+        cache = np.zeros(
+            (len(seqs), max(s.size for s in seqs)), dtype=np.uint8
+        )
+        for i, s in enumerate(seqs):
+            cache[i, :s.size] = s
+
+        np.save(path_out, cache)
 
 
 class Kmerize:
@@ -63,6 +79,11 @@ class Kmerize:
             "G": 3
         }
 
+        # byte-indexed table mapping each base to its one hot row
+        self._lut = np.zeros((256, len(self.lookup)), dtype=np.float32)
+        for base, i in self.lookup.items():
+            self._lut[ord(base), i] = 1
+
     def get_kmers(self, s):
         """
         calculates kmers as slices of sequences
@@ -75,6 +96,69 @@ class Kmerize:
         for i in range(len(s) - self.k + 1):
             yield s[i:i+self.k]
 
+    def ohe_kmers(self, s):
+        """
+        one hot encodes all kmers of a sequence at once
+
+        views the sequence bytes as a strided (n_kmers, k) window matrix
+        and gathers each kmer's encoding through the base lookup table
+
+        :params [s]: a string to create kmers from
+
+        :returns [ohe]: a 2D array of flattened one hot encoded kmers
+        """
+
+        return self._ohe_bytes(
+            np.frombuffer(s.encode("ascii"), np.uint8)
+        )
+
+    def _ohe_bytes(self, arr):
+        """
+        one hot encodes all kmers of a uint8 sequence array
+
+        sequences shorter than k hold no kmers and yield an empty array
+
+        :params [arr]: a 1D uint8 array of sequence bytes
+
+        :returns [ohe]: a 2D array of flattened one hot encoded kmers
+        """
+
+        if arr.size < self.k:
+            return np.zeros(
+                (0, self.k * len(self.lookup)), dtype=self._lut.dtype
+            )
+
+        windows = np.lib.stride_tricks.sliding_window_view(arr, self.k)
+
+        return self._lut[windows].reshape(
+            windows.shape[0], self.k * len(self.lookup)
+        )
+
+    def from_npy(self, path, ohe=False):
+        """
+        iterates kmers from a memory-mapped cache written by
+        FastaReader.to_npy
+
+        rows are zero padded to a common length and trimmed by their
+        nonzero byte count before kmerization
+
+        :params [path]: filename of a .npy sequence cache
+        :params [ohe]: boolean of whether to one hot encode kmers
+
+        :returns [g]: returns a generator of kmers
+        """
+
+        cache = np.load(path, mmap_mode="r")
+
+        for row in cache:
+            seq = row[:np.count_nonzero(row)]
+
+            if ohe:
+                yield from self._ohe_bytes(np.asarray(seq))
+
+            else:
+                yield from self.get_kmers(seq.tobytes().decode("ascii"))
+
     def process(self, iterable, ohe=False):
         """
         iterates through sequences and returns kmers
@@ -86,16 +170,15 @@ class Kmerize:
         :returns [g]: returns a generator of kmers
         """
         for header, seq in iterable:
-            for kmers in self.get_kmers(seq):
 
-                if ohe:
-                    yield OneHotEncoding(kmers, self.lookup, flatten=True)
+            if ohe:
+                yield from self.ohe_kmers(seq)
 
-                else:
-                    yield kmers
+            else:
+                yield from self.get_kmers(seq)
 
 
-def norm(X):
+def norm(X, dtype=np.float32):
     """
     Applies a normalization transformation to a given dataset
 
@@ -103,42 +186,39 @@ def norm(X):
     2) Scale values to 1/max in column
 
     :params [X]: a 2D array to normalize
+    :params [dtype]: the floating point dtype of the normalized array
 
     :returns [N]: a 2D array that is shifted and normalized
     """
 
-    norm = X.copy()
-    for i in np.arange(X.shape[1]):
-        norm[:, i] += np.abs(np.min(X[:, i]))
-        norm[:, i] /= np.max(norm[:, i])
+    X = np.asarray(X, dtype=dtype)
+    shifted = X + np.abs(X.min(axis=0, keepdims=True))
+    return shifted / shifted.max(axis=0, keepdims=True)
 
-    return norm
 
-
-def OneHotEncoding(labels, lookup=None, flatten=False):
+def OneHotEncoding(labels, lookup=None, flatten=False, dtype=np.float32):
     """
     Transforms a given vector of labels into a one hot encoded matrix
 
     :param [labels]: an array-like of labels
     :param [lookup]: a dictionary mapping labels to integers (optional)
     :param [flatten]: boolean of whether to return a flattened matrix
+    :param [dtype]: the floating point dtype of the encoded matrix
 
     :returns [ohe]: a 1/2D array of One Hot Encoded labels
     """
     if not lookup:
 
-        classes = np.unique(labels)
+        # unique returns the integer encoding directly
+        classes, indices = np.unique(labels, return_inverse=True)
         n = classes.size
-        lookup = {
-            c: i for i, c in enumerate(classes)
-        }
 
     else:
         n = len(lookup)
+        indices = np.array([lookup[l] for l in labels], dtype=np.intp)
 
-    ohe = np.zeros((len(labels), n))
-    for idx, l in enumerate(labels):
-        ohe[idx, lookup[l]] = 1
+    ohe = np.zeros((len(labels), n), dtype=dtype)
+    ohe[np.arange(len(labels)), indices] = 1
 
     if flatten:
         return ohe.ravel()
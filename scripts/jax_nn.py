@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import sys
+
+import jax
+import jax.numpy as jnp
+
+from scripts import NN
+
+
+def _free(x):
+    """
+    pass current input forward without modification
+    """
+
+    return x
+
+
+def _mse_loss(pred, y):
+    """
+    mean squared error on a batch of predictions
+    """
+
+    return jnp.mean((pred - y)**2)
+
+
+def _ce_loss(pred, y):
+    """
+    softmax cross entropy on a batch of predictions
+    """
+
+    return jnp.mean(
+        -jnp.sum(y * jax.nn.log_softmax(pred, axis=-1), axis=-1)
+    )
+
+
+# maps NN activation classes to their jax equivalents
+JAX_ACTIVATIONS = {
+    None: _free,
+    NN.Sigmoid: jax.nn.sigmoid,
+    NN.TanH: jnp.tanh,
+    NN.Free: _free
+}
+
+# maps NN loss classes to their jax equivalents
+JAX_LOSSES = {
+    NN.MSE: _mse_loss,
+    NN.CE: _ce_loss
+}
+
+
+class JAXNeuralNetwork:
+    """
+    JAX-backed feed forward neural network
+
+    mirrors NN.NeuralNetwork's layer specification and training API but
+    derives the backward pass with jax.grad, batches the forward pass
+    with jax.vmap, and jit-compiles the whole update so XLA fuses each
+    layer's matmul, bias, and activation into one kernel
+
+    requires the optional jax dependency (pip install jax)
+
+    :param layers: a list of (int, NN.Activation) tuples to specify layers
+    :param learning_rate: the learning rate to train model with
+    """
+
+    def __init__(self, layers, learning_rate=0.1):
+
+        self.layers = layers
+        self.learning_rate = learning_rate
+
+        self._acts = tuple(
+            JAX_ACTIVATIONS[f] for _, f in layers
+        )
+
+        self.params = [
+            (
+                jnp.asarray(
+                    np.random.random((layers[i][0], layers[i-1][0])),
+                    dtype=jnp.float32
+                ),
+                jnp.asarray(
+                    np.random.random(layers[i][0]),
+                    dtype=jnp.float32
+                )
+            )
+            for i in range(1, len(layers))
+        ]
+
+        self._forward = jax.jit(
+            jax.vmap(self._single_forward, in_axes=(None, 0))
+        )
+
+        # caches one jitted value_and_grad per loss class
+        self._grad_fns = {}
+
+    def _single_forward(self, params, x):
+        """
+        forward propagation of a single observation
+
+        pure function of (params, x) so it can be vmapped and traced
+
+        :param params: list of (weights, bias) tuples
+        :param x: a single observation to pass forward
+
+        :returns y: final activation layer
+        """
+
+        a = x
+        for (w, b), f in zip(params, self._acts[1:]):
+            a = f(a @ w.T + b)
+
+        return a
+
+    def _grad_fn(self, Loss):
+        """
+        builds (and caches) the jitted loss-and-gradient function
+        for a given NN.Loss object
+
+        :param Loss: NN.Loss object as Cost function
+
+        :returns fn: jitted callable of (params, X, Y)
+        """
+
+        key = type(Loss)
+        if key not in self._grad_fns:
+
+            loss_fn = JAX_LOSSES[key]
+
+            def batch_loss(params, X, Y):
+                pred = jax.vmap(
+                    self._single_forward, in_axes=(None, 0)
+                )(params, X)
+                return loss_fn(pred, Y)
+
+            self._grad_fns[key] = jax.jit(
+                jax.value_and_grad(batch_loss)
+            )
+
+        return self._grad_fns[key]
+
+    def fit(self, X, Y, Loss, n_epochs=100, status_updates=10,
+            verbose=False):
+        """
+        Trains model given X:observations and Y:labels
+
+        :param X: observations to pass through network
+        :param Y: labels to use in backpropagation
+        :param Loss: NN.Loss object as Cost function
+        :param n_epochs: Number of epochs to train model
+        :param status_updates: Number of epochs to report mean loss
+        :param verbose: Boolean of verbosity
+        """
+
+        X = jnp.asarray(X, dtype=jnp.float32)
+        Y = jnp.asarray(Y, dtype=jnp.float32)
+
+        value_and_grad = self._grad_fn(Loss)
+
+        # iterate through dataset
+        for epoch in range(n_epochs):
+
+            # loss and full gradient in one jitted call
+            loss, grads = value_and_grad(self.params, X, Y)
+
+            # gradient descent over the parameter tree
+            self.params = jax.tree_util.tree_map(
+                lambda p, g: p - self.learning_rate * g,
+                self.params, grads
+            )
+
+            # prints out current epochs loss
+            if verbose:
+                if (epoch % status_updates == 0) | (epoch == n_epochs-1):
+                    print(
+                        "Mean Loss at epoch {} : {:.6f}".format(
+                            epoch, float(loss)
+                            ),
+                        file=sys.stderr
+                    )
+
+    def predict(self, X):
+        """
+        Feeds forward all observations in X and returns predictions
+
+        :param X: Observations to predict values for
+        :returns Y: Predicted labels of X
+        """
+
+        X = jnp.asarray(X, dtype=jnp.float32)
+        return np.asarray(self._forward(self.params, X))
@@ -4,6 +4,7 @@ from sklearn.datasets import make_blobs
 
 import numpy as np
 import os
+import pytest
 
 
 def test_activation_sigmoid():
@@ -91,6 +92,37 @@ def test_kmer_reader():
         assert ohe.size == (k_size * 4)
 
 
+def test_kmer_short_sequence():
+    km = io.Kmerize(k=17)
+    records = [(">short", "ACGT")]
+
+    assert len(list(km.process(records, ohe=False))) == 0
+    assert len(list(km.process(records, ohe=True))) == 0
+
+
+def test_fasta_npy_cache(tmp_path):
+    k_size = 7
+    path = os.path.abspath("data/yeast-upstream-1k-negative.fa")
+    cache = str(tmp_path / "sequences.npy")
+
+    fr = io.FastaReader(path)
+    fr.to_npy(cache)
+
+    assert np.load(cache, mmap_mode="r").shape[0] == 3164
+
+    km = io.Kmerize(k=k_size)
+
+    for idx, kmer in enumerate(km.from_npy(cache)):
+        if idx == 100:
+            break
+        assert len(kmer) == k_size
+
+    for idx, ohe in enumerate(km.from_npy(cache, ohe=True)):
+        if idx == 100:
+            break
+        assert ohe.size == (k_size * 4)
+
+
 def test_OHE():
     labels = np.random.choice(np.arange(3), size=(100))
 
@@ -138,3 +170,28 @@ def test_nn():
     Y = net.predict(N)
 
     assert np.isnan(Y).sum() == 0
+
+
+def test_jax_nn():
+    pytest.importorskip("jax")
+    from scripts import jax_nn
+
+    X, labels = make_blobs(
+        n_samples=200, n_features=8, centers=4
+        )
+    N = io.norm(X)
+
+    net = jax_nn.JAXNeuralNetwork(
+        layers=[
+            (8, None),
+            (4, nn.Sigmoid),
+            (8, nn.Sigmoid)
+        ],
+        learning_rate=0.8
+    )
+    Loss = nn.MSE()
+
+    net.fit(N, N, Loss)
+    Y = net.predict(N)
+
+    assert np.isnan(Y).sum() == 0